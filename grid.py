@@ -3,6 +3,49 @@ from __future__ import annotations
 from data_structures.referential_array import ArrayR
 from layer_store import *
 
+
+class GridRow:
+    """
+    View of a single row of a Grid.
+    The squares of a Grid are stored in one flat array, and a row is a run of consecutive squares in it.
+    """
+
+    def __init__(self, grid: Grid, start: int, length: int) -> None:
+        """
+        Initialise the row view.
+        - grid: The grid this row belongs to.
+        - start: Index in the flat array of squares of the grid of the first square of this row.
+        - length: Number of squares in this row.
+
+        Worst and best case complexity: O(1)
+        """
+        self.grid = grid
+        self.start = start
+        self.length = length
+
+    def __len__(self) -> int:
+        """
+        Returns the number of squares in this row.
+
+        Worst and best case complexity: O(1)
+        """
+        return self.length
+
+    def __getitem__(self, index: int) -> LayerStore:
+        """
+        Returns the square at index of this row.
+        Like an ArrayR, negative indices count back from the end of the row.
+        The LayerStore of the square is created on its first access.
+
+        Worst and best case complexity: O(1)
+        """
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("Row index out of range")
+        return self.grid.store_at(self.start + index)
+
+
 class Grid:
     DRAW_STYLE_SET = "SET"
     DRAW_STYLE_ADD = "ADD"
@@ -17,6 +60,24 @@ class Grid:
     MAX_BRUSH = 5
     MIN_BRUSH = 0
 
+    LAYER_STORE = None  # LayerStore class used on each grid square, set by each subclass
+
+    def __new__(cls, draw_style, x, y):
+        """
+        Creates the grid object as the subclass of Grid for draw_style,
+        so that every grid square of a grid is known to use the same LayerStore.
+
+        Worst and best case complexity: O(1)
+        """
+        if cls is Grid:
+            if draw_style == Grid.DRAW_STYLE_SET:
+                cls = SetGrid
+            elif draw_style == Grid.DRAW_STYLE_ADD:
+                cls = AdditiveGrid
+            else:
+                cls = SequenceGrid
+        return super().__new__(cls)
+
     def __init__(self, draw_style, x, y) -> None:
         """
         Initialise the grid object.
@@ -36,21 +97,36 @@ class Grid:
         self.x = x
         self.y = y
         self.brush_size = Grid.DEFAULT_BRUSH_SIZE  # Set brush size as default brush size
-        self.grid = ArrayR(x)  # 2D array to represent the grid
+        # Flat array of every grid square, square (i, j) is stored at index i * y + j.
+        # Squares stay None until they are first accessed, as most squares of a painting are never painted on.
+        self.grid = ArrayR(x * y)
+        self.rows = ArrayR(x)  # Row views into self.grid, so that squares can still be accessed as grid[i][j]
+        self.empty = self.new_store()  # Store with no layers, standing in for the squares which are still None
+        self.used = []  # LayerStores of the squares which have been accessed, in the order they were first accessed
 
-        # Fill up None values in self.grid with Array of LayerStores
         for i in range(x):
-            self.grid[i] = ArrayR(y)  # Set each None value to an Array of length y
-            for j in range(y):
+            self.rows[i] = GridRow(self, i * y, y)  # Create the view of row i once
 
-                # Set each value of the self.grid[i] array to their specific layer store
-                if self.draw_style == Grid.DRAW_STYLE_SET:
-                    self.grid[i][j] = SetLayerStore()
-                elif self.draw_style == Grid.DRAW_STYLE_ADD:
-                    self.grid[i][j] = AdditiveLayerStore()
-                else:
-                    self.grid[i][j] = SequenceLayerStore()
+    def new_store(self) -> LayerStore:
+        """
+        Creates the LayerStore for a single grid square.
+
+        Worst and best case complexity: O(1)
+        """
+        return self.LAYER_STORE()
 
+    def store_at(self, k: int) -> LayerStore:
+        """
+        Returns the LayerStore of the square at index k of self.grid, creating it if it is still None.
+
+        Worst and best case complexity: O(1)
+        """
+        square = self.grid[k]
+        if square is None:
+            square = self.new_store()  # First access of the square, create its LayerStore
+            self.grid[k] = square
+            self.used.append(square)
+        return square
 
     def increase_brush_size(self):
         """
@@ -76,25 +152,48 @@ class Grid:
         """Called when the special action is requested.
 
         Complexity analysis:
-        Let x and y be the dimensions of the grid. Lets consider three possible cases for the LayerStore.
+        Let x and y be the dimensions of the grid.
+        Lets consider the two LayerStores which use this method, SetGrid overrides it for SetLayerStore.
 
-        SetLayerStore:
-        The complexity of the special method in SetLayerStore is O(1) as it just toggles a boolean value between True and False.
-        Hence, the worst and best case complexity for special when the draw_style is SetLayerStore is O(xy).
+        Squares which were never accessed have no layers for special to change, so only the squares in self.used
+        are visited. Let u be the number of squares used, at most xy.
 
         AdditiveLayerStore:
-        Let n be the average number of layers stored in self.layers.
+        Let n be the average number of layers stored in each AdditiveLayerStore.
         For each square, activating the special method costs O(n) time.
-        Hence, the worst and best case complexity for special when the draw_style is AdditiveLayerStore is O(xyn).
+        Hence, the worst and best case complexity for special when the draw_style is AdditiveLayerStore is O(un).
 
         SequenceLayerStore:
         Let n be the number of layers in get_layers().
-        For each square, the worst case complexity for activating the special method is O(n^2).
-        Hence, the worst and best case complexity for special when the draw_style is SequenceLayerStore is O(xyn^2).
+        For each square, the worst case complexity for activating the special method is O(n).
+        Hence, the worst and best case complexity for special when the draw_style is SequenceLayerStore is O(un).
         """
+        special = self.LAYER_STORE.special  # Every square uses the same LayerStore, so its special is looked up once
+        for square in self.used:
+            special(square)  # Activate the special effect on all of the used grids in the self.grid array
+
+    def render(self, start: tuple[int, int, int], timestamp: int) -> list[tuple[int, int, int]]:
+        """
+        Computes the colour of every grid square in a single pass over the flat array of squares.
+        Returns the colours as a list in the order of `for i in range(x): for j in range(y)`,
+        so callers walking the grid in that order can take the colours one after another.
+
+        Complexity analysis:
+        Let x and y be the dimensions of the grid, and c be the complexity of get_color of the LayerStore used.
+        Hence, the worst and best case complexity is O(xyc).
+        """
+        squares = self.grid  # Local references avoid repeated attribute lookups in the loop
+        empty = self.empty
+        get_color = self.LAYER_STORE.get_color
+        colours = []
+        append = colours.append
+        k = 0  # Index of square (i, j) in self.grid
         for i in range(self.x):
             for j in range(self.y):
-                self.grid[i][j].special()  # Activate the special effect on all of the grids in the self.grid array
+                square = squares[k]
+                append(get_color(empty if square is None else square, start, timestamp, i, j))
+                k += 1
+        return colours
 
     def __getitem__(self, index):
         """
@@ -102,4 +201,54 @@ class Grid:
 
         Worst and best case complexity: O(1)
         """
-        return self.grid[index]  # Returns the row of self.grid at index
+        return self.rows[index]  # Returns the view of the row of self.grid at index
+
+
+class SetGrid(Grid):
+    """
+    Grid using SetLayerStore on each grid square.
+    """
+
+    LAYER_STORE = SetLayerStore
+
+    def __init__(self, draw_style, x, y) -> None:
+        """
+        Initialise the grid object, with the special toggle shared by every SetLayerStore of the grid.
+
+        Worst and best case complexity: O(xy), where x, y are dimensions of the grid
+        """
+        self.on_special = False  # Special toggle read by the get_color of every SetLayerStore of the grid
+        super().__init__(draw_style, x, y)
+
+    def new_store(self) -> SetLayerStore:
+        """
+        Creates the SetLayerStore for a single grid square, sharing the special toggle of this grid.
+
+        Worst and best case complexity: O(1)
+        """
+        return SetLayerStore(self)
+
+    def special(self):
+        """
+        Called when the special action is requested.
+        Every SetLayerStore of the grid reads the special toggle stored on the grid, so only that one boolean is toggled.
+
+        Worst and best case complexity: O(1)
+        """
+        self.on_special = not self.on_special  # Toggles the special effect for all the grid squares at once
+
+
+class AdditiveGrid(Grid):
+    """
+    Grid using AdditiveLayerStore on each grid square.
+    """
+
+    LAYER_STORE = AdditiveLayerStore
+
+
+class SequenceGrid(Grid):
+    """
+    Grid using SequenceLayerStore on each grid square.
+    """
+
+    LAYER_STORE = SequenceLayerStore
@@ -1,12 +1,33 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
+import layer_util
 from layer_util import Layer, get_layers
 from layers import *
-from data_structures.queue_adt import CircularQueue
-from data_structures.stack_adt import ArrayStack
-from data_structures.bset import BSet
-from data_structures.array_sorted_list import ArraySortedList
-from data_structures.sorted_list_adt import ListItem
+
+# The layer array of layer_util. Layers registered later are stored in this same array, so holding a reference to it
+# stays up to date, while saving calling get_layers() (and its import statement) for every grid square.
+_LAYERS = get_layers()
+_NLAYERS = len(_LAYERS)  # Capacity of the layer array, which is fixed
+
+_name_order = ()  # Indices of the registered layers, sorted by name (then by index)
+_name_order_count = 0  # Number of registered layers when _name_order was built
+
+
+def _get_name_order() -> tuple[int, ...]:
+    """
+    Returns the indices of the registered layers, sorted by name (then by index),
+    used to find the median name of a set of layers.
+    The order is only rebuilt when the number of registered layers has changed since it was last built.
+
+    Complexity: O(1) if no layer was registered since the last call, otherwise O(n log n),
+    where n is the number of registered layers
+    """
+    global _name_order, _name_order_count
+    count = layer_util.cur_layer_index  # Read through the module, as register() rebinds it
+    if count != _name_order_count:
+        _name_order = tuple(sorted(range(count), key=lambda index: (_LAYERS[index].name, index)))
+        _name_order_count = count
+    return _name_order
 
 
 class LayerStore(ABC):
@@ -53,15 +74,19 @@ class SetLayerStore(LayerStore):
     - special: Invert the colour output.
     """
 
-    def __init__(self):
+    def __init__(self, grid=None):
         """
         Constructor for SetLayerStore. Initializes the instance variables to be used to store the layer used for this grid square
         and for the toggle for special mode.
+        - grid:
+            Optional Grid owning this square. Its on_special toggle is shared by every square of the grid,
+            so a special action on the whole grid flips one boolean instead of one per square.
 
         Complexity: O(1)
         """
         self.layer = None
         self.on_special = False
+        self.grid = grid
 
     def add(self, layer: Layer) -> bool:
         """
@@ -78,6 +103,9 @@ class SetLayerStore(LayerStore):
         Takes in the starting colour of the square and returns the new colour of the square
         depending if there exist a layer to apply and if the special toggle is on.
 
+        Reading the special toggle of the grid adds one check to every call, which runs for every square each frame.
+        That is the trade-off for Grid.special being O(1) instead of O(xy) when the draw style is SET.
+
         Complexity: O(1)
         """
         colour = start  # Initial starting colour
@@ -85,7 +113,11 @@ class SetLayerStore(LayerStore):
         if self.layer is not None:  # If there exist a layer to be applied
             colour = self.layer.apply(start, timestamp, x, y)  # Apply layer
 
-        if self.on_special:  # If the special toggle is on
+        on_special = self.on_special  # Special toggle of this square
+        if self.grid is not None and self.grid.on_special:
+            on_special = not on_special  # Grid wide special toggle inverts the colour once more
+
+        if on_special:  # If the special toggle is on
             colour = invert.apply(colour, timestamp, x, y)  # Apply special effect (invert colour)
 
         return colour  # Return final colour
@@ -119,13 +151,21 @@ class AdditiveLayerStore(LayerStore):
     - special: Reverse the order of current layers (first becomes last, etc.)
     """
 
+    MAX_LAYERS = _NLAYERS * 100  # Maximum number of layers stored in a single square
+    # Size of the circular buffer, MAX_LAYERS rounded up to a power of two so that positions wrap with a bitmask
+    BUFFER_SIZE = 1 << (MAX_LAYERS - 1).bit_length()
+    BUFFER_MASK = BUFFER_SIZE - 1
+
     def __init__(self):
         """
-        Constructor for AdditiveLayerStore class. Used to declare the CircularQueue to be used to store the layers added.
+        Constructor for AdditiveLayerStore class. Used to declare the circular buffer to be used to store the layers added.
+        Each layer is stored as its index in get_layers(), which fits in a single byte as there are fewer than 256 layers.
 
-        Complexity: O(n), where n is the number of layers in the get_layers() array
+        Complexity: O(m), where m is BUFFER_SIZE
         """
-        self.layers = CircularQueue(len(get_layers()) * 100)  # Declare queue of length 'number of layers' * 100
+        self.buffer = bytearray(AdditiveLayerStore.BUFFER_SIZE)  # Circular buffer of layer indices
+        self.front = 0  # Position in buffer of the oldest layer
+        self.length = 0  # Number of layers stored
 
     def add(self, layer: Layer) -> bool:
         """
@@ -133,56 +173,64 @@ class AdditiveLayerStore(LayerStore):
 
         Complexity: O(1)
         """
-        if self.layers.is_full():
-            return False  # Returns False if queue is full
+        if self.length >= AdditiveLayerStore.MAX_LAYERS:
+            return False  # Returns False if buffer is full
 
-        self.layers.append(layer)  # Queue is not full, add layer to queue
+        rear = (self.front + self.length) & AdditiveLayerStore.BUFFER_MASK  # Position after the newest layer
+        self.buffer[rear] = layer.index  # Buffer is not full, add layer to buffer
+        self.length += 1
         return True  # Returns True to specify that layer was successfully added
 
     def get_color(self, start: tuple[int, int], timestamp: int, x: int, y: int) -> tuple[int, int, int]:
         """
-        Takes in starting colour and applied all the layers added into the queue in the order of the queue and returns
+        Takes in starting colour and applied all the layers added into the buffer in the order they were added and returns
         the final colour.
 
-        Complexity: O(n), where n is the number of layers in the get_layers() array
+        Complexity: O(n), where n is the number of layers stored in self.buffer
         """
         colour = start  # Initially the colour is start
 
-        for i in range(len(self.layers)):  # For every layer in the queue
-            current_layer = self.layers.serve()  # Remove oldest element in queue
-            self.layers.append(current_layer)  # Append it back into the queue so that the order is preserved
-            colour = current_layer.apply(colour, timestamp, x, y)  # Apply current layer
+        # Copy out the layer indices, oldest first, so the loop below does no position arithmetic
+        rear = self.front + self.length
+        if rear <= AdditiveLayerStore.BUFFER_SIZE:
+            indices = self.buffer[self.front:rear]  # Layers are stored in one run of the buffer
+        else:
+            indices = self.buffer[self.front:] + self.buffer[:rear - AdditiveLayerStore.BUFFER_SIZE]  # Run wraps around
+
+        layers = _LAYERS  # Local reference avoids a global lookup per layer
+        for index in indices:  # For every layer in the buffer, oldest first
+            colour = layers[index].apply(colour, timestamp, x, y)  # Apply current layer
 
         return colour  # Returns final colour
 
     def erase(self, layer: Layer) -> bool:
         """
-        Removes the oldest layer in the queue. Returns True if a layer was removed, False otherwise.
+        Removes the oldest layer in the buffer. Returns True if a layer was removed, False otherwise.
 
         Complexity: O(1)
         """
-        try:
-            self.layers.serve()  # Attempt to remove oldest layer in the queue
-            return True  # Returns True if removal was successful
+        if self.length == 0:
+            return False  # Buffer is empty, there is no layer to remove
 
-        except:
-            return False  # If queue was empty, serve() would cause an exception which would be caught here, returns False
+        self.front = (self.front + 1) & AdditiveLayerStore.BUFFER_MASK  # Remove oldest layer in the buffer
+        self.length -= 1
+        return True  # Returns True as a layer was removed
 
     def special(self):
         """
-        Reverses queue when this method is invoked.
+        Reverses the order of the layers when this method is invoked.
 
-        Complexity: O(n), where n is the number of layers stored in self.layers
+        Complexity: O(n), where n is the number of layers stored in self.buffer
         """
-        aux_stack = ArrayStack(len(self.layers))  # Creates a stack to be used as a helper data structure
-        while not self.layers.is_empty():
-            aux_stack.push(self.layers.serve())  # Push all the elements from queue into the stack
-            # All elements would be pushed into the stack following the order of the queue
-
-        while not aux_stack.is_empty():
-            self.layers.append(aux_stack.pop())  # Pop all elements from queue and append into stack
-            # All elements from the stack would be popped from the opposite order from it was pushed into.
-            # Hence, it will append in reverse order.
+        rear = self.front + self.length
+        if rear <= AdditiveLayerStore.BUFFER_SIZE:
+            # Layers are stored in one run of the buffer, reverse the run in place
+            self.buffer[self.front:rear] = self.buffer[self.front:rear][::-1]
+        else:
+            # Layers wrap around the end of the buffer, join both runs and store them reversed from the start
+            layers = self.buffer[self.front:] + self.buffer[:rear - AdditiveLayerStore.BUFFER_SIZE]
+            self.buffer[:self.length] = layers[::-1]
+            self.front = 0
 
 
 class SequenceLayerStore(LayerStore):
@@ -197,11 +245,12 @@ class SequenceLayerStore(LayerStore):
 
     def __init__(self):
         """
-        Constructor for SequenceLayerStore class. Used to declare the BSet to be used to store the layers added.
+        Constructor for SequenceLayerStore class. Used to declare the bitmask used to store the layers added.
+        Bit i of the bitmask is on if the layer with index i in get_layers() is applied.
 
         Complexity: O(1)
         """
-        self.layers = BSet()  # Declares set to store layers
+        self.layers = 0  # Bitmask of the layers applied, no layers to begin with
 
     def add(self, layer: Layer) -> bool:
         """
@@ -209,25 +258,27 @@ class SequenceLayerStore(LayerStore):
 
         Complexity: O(1)
         """
-        index = layer.index + 1  # Compute index of the layer
-        flag = index not in self.layers  # Checks if layer already exists in set
-        self.layers.add(index)  # Adds layer to the set
+        mask = 1 << layer.index  # Bit of the layer
+        flag = not self.layers & mask  # Checks if layer already exists in set
+        self.layers |= mask  # Adds layer to the set
         return flag  # Returns true or false depending if layer already exists in set
 
     def get_color(self, start: tuple[int, int], timestamp: int, x: int, y: int) -> tuple[int, int, int]:
         """
         Takes in starting colour and applied all the layers in the order of the index in get_layers() that is added to the set.
 
-        Complexity: O(n), where n is the number of layers in get_layers()
+        The set bits of the bitmask are visited from lowest to highest, so the layers are applied in order of index
+        and layers which are not in the set are never looked at.
+
+        Complexity: O(n), where n is the number of layers in the set
         """
         colour = start  # Initial colour
-        for index in range(1, len(get_layers()) + 1):  # For every possible layer index
-            try:
-                assert index in self.layers  # Check if index exist in the set
-                colour = get_layers()[index - 1].apply(colour, timestamp, x, y)  # Applies layer if it does indeed exist
-
-            except:
-                continue  # Index does not exist in set
+        bits = self.layers
+        while bits:
+            lowest = bits & -bits  # Isolate the lowest set bit
+            index = lowest.bit_length() - 1  # Index of the layer stored in that bit
+            colour = _LAYERS[index].apply(colour, timestamp, x, y)  # Applies the layer with that index
+            bits ^= lowest  # Turn the bit off and move on to the next one
 
         return colour  # Returns final colour
 
@@ -237,13 +288,12 @@ class SequenceLayerStore(LayerStore):
 
         Complexity: O(1)
         """
-        try:
-            index = layer.index + 1  # Compute layer index
-            self.layers.remove(index)  # Attempts to remove index
-            return True  # Returns True if removal was successful
+        mask = 1 << layer.index  # Bit of the layer
+        if not self.layers & mask:
+            return False  # Layer is not in the set, nothing to remove
 
-        except:
-            return False  # Otherwise, return False
+        self.layers ^= mask  # Removes layer from the set
+        return True  # Returns True as removal was successful
 
     def special(self):
         """
@@ -252,18 +302,20 @@ class SequenceLayerStore(LayerStore):
         Complexity analysis:
         Let n be the number of layers in get_layers().
 
-        Creating the sorted_layer_names ArrayStoredList will take O(n) time.
-        The loop will loop through n times.
-        The .add method worst case takes O(n) to insert an element into the list.
+        _get_name_order() returns the layer indices already sorted by name, so the layers in the set are found in
+        name order by a single scan of it, and the scan stops at the median.
         Other operations takes O(1) time.
 
-        Hence, the time complexity is O(n^2).
+        Hence, the time complexity is O(n).
         """
-        sorted_layer_names = ArraySortedList(len(get_layers()))  # Initialize the ArraySortedList used to store the index and the name of each layer
-        for index in range(1, len(get_layers()) + 1):  # For every potential layer
-            if index in self.layers:
-                sorted_layer_names.add(ListItem(index, get_layers()[index - 1].name))
-
+        count = bin(self.layers).count("1")  # Number of layers in the set
+        if count == 0:
+            return  # No layer to remove
 
-        if len(sorted_layer_names) > 0:  # If the ArraySortedList is not empty
-            self.layers.remove(sorted_layer_names[(len(sorted_layer_names) - 1) // 2].value)  # Then remove the median element from the set
+        median = (count - 1) // 2  # Position of the median layer among the layers in the set, in name order
+        for index in _get_name_order():  # For every layer, in order of name
+            if self.layers >> index & 1:
+                if median == 0:
+                    self.layers ^= 1 << index  # Remove the median element from the set
+                    return
+                median -= 1
@@ -123,6 +123,7 @@ class MyWindow(arcade.Window):
         # UI - Draw Modes / Action buttons
         self.action_buttons.draw()
         # Grid
+        colours = iter(self.grid.render(self.BG[:], self.timestamp))  # Colours in the same order as the loops below
         for x in range(self.GRID_SIZE_X):
             for y in range(self.GRID_SIZE_Y):
                 arcade.draw_lrtb_rectangle_filled(
@@ -130,7 +131,7 @@ class MyWindow(arcade.Window):
                     self.GRID_SQ_WIDTH * (x+1),
                     self.GRID_SQ_HEIGHT * (y+1),
                     self.GRID_SQ_HEIGHT * y,
-                    self.grid[x][y].get_color(self.BG[:], self.timestamp, x, y),
+                    next(colours),
                 )
 
     def on_mouse_press(self, x: int, y: int, button: int, modifiers: int) -> None:
@@ -371,18 +372,20 @@ class MyWindow(arcade.Window):
         Let x and y be the dimensions of the grid. Lets consider three possible cases for the LayerStore.
 
         SetLayerStore:
-        The complexity of the special method in SetLayerStore is O(1) as it just toggles a boolean value between True and False.
-        Hence, the worst and best case complexity for special when the draw_style is SetLayerStore is O(xy).
+        Every SetLayerStore of the grid reads the special toggle stored on the grid, so only that one boolean is toggled.
+        Hence, the worst and best case complexity for special when the draw_style is SetLayerStore is O(1).
+
+        Only the squares which have been used are visited. Let u be the number of squares used, at most xy.
 
         AdditiveLayerStore:
-        Let n be the average number of layers stored in self.layers.
+        Let n be the average number of layers stored in each AdditiveLayerStore.
         For each square, activating the special method costs O(n) time.
-        Hence, the worst and best case complexity for special when the draw_style is AdditiveLayerStore is O(xyn).
+        Hence, the worst and best case complexity for special when the draw_style is AdditiveLayerStore is O(un).
 
         SequenceLayerStore:
         Let n be the number of layers in get_layers().
-        For each square, the worst case complexity for activating the special method is O(n^2).
-        Hence, the worst and best case complexity for special when the draw_style is SequenceLayerStore is O(xyn^2).
+        For each square, the worst case complexity for activating the special method is O(n).
+        Hence, the worst and best case complexity for special when the draw_style is SequenceLayerStore is O(un).
         """
         special_action = PaintAction(is_special=True)  # Create a PaintAction instance with is_special value True
 
@@ -394,7 +397,7 @@ class MyWindow(arcade.Window):
     def on_replay_start(self) -> None:
         """Called when the replay starting is requested.
 
-        Worst and best case complexity: O(1)
+        Worst and best case complexity: O(n), where n is the number of actions stored in the replay tracker
         """
         self.replay_tracker.start_replay()
 
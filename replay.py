@@ -6,17 +6,25 @@ from data_structures.queue_adt import CircularQueue
 class ReplayTracker:
     def __init__(self):
         self.action_queue = CircularQueue(11000)  # Class variable to store actions to be replayed, O(1) operation as it is a fixed capacity
+        self.replay_actions = ()  # Actions being replayed, taken out of action_queue when the replay starts
+        self.replay_index = 0  # Index in replay_actions of the next action to be played
+
     def start_replay(self) -> None:
         """
         Called whenever we should stop taking actions, and start playing them back.
 
         Useful if you have any setup to do before `play_next_action` should be called.
 
-        No setup is required for this implementation.
+        Drains action_queue into a tuple, so that each call to `play_next_action` is a plain index into it.
 
-        Complexity: O(1)
+        Complexity: O(n), where n is the number of actions in action_queue
         """
-        pass
+        actions = []
+        while not self.action_queue.is_empty():
+            actions.append(self.action_queue.serve())  # Take the actions out in the order they were added
+
+        self.replay_actions = tuple(actions)
+        self.replay_index = 0
 
 
     def add_action(self, action: PaintAction, is_undo: bool=False) -> None:
@@ -40,28 +48,29 @@ class ReplayTracker:
 
         Worst and best case complexity: O(n), where n is the number of steps needed to be processed in this action
         """
-        try:
-            action, is_undo = self.action_queue.serve()  # Obtain next action to be processed
+        if self.replay_index >= len(self.replay_actions):
+            return True  # No more actions are to be played
 
-            # Check if the current action to be played is an undo action
-            if is_undo:
-                action.undo_apply(grid)  # Undo action
-            else:
-                action.redo_apply(grid)  # Otherwise, perform the action using redo_apply
+        action, is_undo = self.replay_actions[self.replay_index]  # Obtain next action to be processed
+        self.replay_index += 1
 
-            return False
+        # Check if the current action to be played is an undo action
+        if is_undo:
+            action.undo_apply(grid)  # Undo action
+        else:
+            action.redo_apply(grid)  # Otherwise, perform the action using redo_apply
 
-        except:
-            # Exception is caused when queue is empty, i.e. when no more actions are to be played
-            return True
+        return False
 
     def clear(self) -> None:
         """
-        Helper method used to clear the action_queue.
+        Helper method used to clear the action_queue and any replay in progress.
 
         Worst and best case complexity: O(1)
         """
         self.action_queue.clear()  # Clears queue using CircularQueue method
+        self.replay_actions = ()
+        self.replay_index = 0
 
 
 if __name__ == "__main__":
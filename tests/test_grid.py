@@ -0,0 +1,52 @@
+import unittest
+
+from grid import AdditiveGrid, Grid, SequenceGrid, SetGrid
+from layer_store import SetLayerStore
+from layers import red
+
+
+class TestGridSubclasses(unittest.TestCase):
+
+    def test_draw_style_picks_subclass(self):
+        self.assertIsInstance(Grid(Grid.DRAW_STYLE_SET, 2, 2), SetGrid)
+        self.assertIsInstance(Grid(Grid.DRAW_STYLE_ADD, 2, 2), AdditiveGrid)
+        self.assertIsInstance(Grid(Grid.DRAW_STYLE_SEQUENCE, 2, 2), SequenceGrid)
+
+    def test_set_special_inverts_every_square(self):
+        g = Grid(Grid.DRAW_STYLE_SET, 2, 2)
+        g[1][0].add(red)
+        before = g.render((0, 0, 0), 0)
+        g.special()
+        after = g.render((0, 0, 0), 0)
+        self.assertEqual(after, [tuple(255 - c for c in colour) for colour in before])
+
+
+class TestLazySquares(unittest.TestCase):
+
+    def test_reads_do_not_create_stores(self):
+        for style in Grid.DRAW_STYLE_OPTIONS:
+            g = Grid(style, 2, 3)
+            g.render((0, 0, 0), 0)
+            g.special()
+            g.render((0, 0, 0), 0)
+            self.assertTrue(all(g.grid[k] is None for k in range(2 * 3)))
+            self.assertEqual(g.used, [])
+
+    def test_square_created_once(self):
+        g = Grid(Grid.DRAW_STYLE_ADD, 2, 3)
+        self.assertIs(g[1][2], g[1][2])
+        self.assertIs(g[1][-1], g[1][2])
+        self.assertIs(g.grid[5], g[1][2])
+        self.assertEqual(g.used, [g[1][2]])
+
+    def test_square_uses_layer_store_of_draw_style(self):
+        self.assertIsInstance(Grid(Grid.DRAW_STYLE_SET, 2, 2)[0][0], SetLayerStore)
+
+    def test_untouched_set_squares_follow_special(self):
+        g = Grid(Grid.DRAW_STYLE_SET, 2, 2)
+        g.special()
+        self.assertEqual(g.render((10, 20, 30), 0), [(245, 235, 225)] * 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,183 @@
+import unittest
+
+import layer_util
+from layer_util import get_layers, register
+from layers import black, blue, darken, lighten, red
+from layer_store import AdditiveLayerStore, SequenceLayerStore
+
+
+def brown(color, timestamp, x, y):
+    return (150, 75, 0)
+
+
+class LateLayerTestCase(unittest.TestCase):
+    """Registers an extra layer after layer_store was imported, and removes it again after the test."""
+
+    def setUp(self) -> None:
+        self.late = register(brown)
+
+    def tearDown(self) -> None:
+        layer_util.cur_layer_index -= 1
+        layer_util.LAYERS[layer_util.cur_layer_index] = None
+
+
+def apply_all(layers, start):
+    colour = start
+    for layer in layers:
+        colour = layer.apply(colour, 0, 0, 0)
+    return colour
+
+
+class TestAdditiveLayerStore(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.store = AdditiveLayerStore()
+        self.model = []  # Layers the store should hold, oldest first
+
+    def add(self, layer) -> None:
+        self.assertTrue(self.store.add(layer))
+        self.model.append(layer)
+
+    def erase(self) -> None:
+        self.assertTrue(self.store.erase(None))
+        self.model.pop(0)
+
+    def assertColour(self) -> None:
+        start = (100, 100, 100)
+        self.assertEqual(self.store.get_color(start, 0, 0, 0), apply_all(self.model, start))
+
+    def fill_wrapped(self) -> None:
+        # Layers are added in a pattern where order matters, then enough are erased and added again that the
+        # stored run starts near the end of the buffer and continues at the start of it.
+        pattern = (black, lighten, lighten, darken, red, lighten)
+        for k in range(AdditiveLayerStore.MAX_LAYERS):
+            self.add(pattern[k % len(pattern)])
+        for k in range(100):
+            self.erase()
+            self.add(pattern[(k * 5) % len(pattern)])
+        self.assertGreater(self.store.front + self.store.length, AdditiveLayerStore.BUFFER_SIZE)
+
+    def test_empty(self):
+        self.assertFalse(self.store.erase(None))
+        self.assertEqual(self.store.get_color((1, 2, 3), 0, 0, 0), (1, 2, 3))
+
+    def test_order_and_special(self):
+        for layer in (black, lighten, lighten):
+            self.add(layer)
+        self.assertColour()
+        self.store.special()
+        self.model.reverse()
+        self.assertColour()
+        self.erase()
+        self.assertColour()
+
+    def test_full(self):
+        for _ in range(AdditiveLayerStore.MAX_LAYERS):
+            self.add(lighten)
+        self.assertFalse(self.store.add(lighten))
+
+    def test_wrap_around(self):
+        self.fill_wrapped()
+        self.assertColour()
+        self.assertFalse(self.store.add(red))
+
+    def test_special_on_wrapped_run(self):
+        self.fill_wrapped()
+        self.store.special()
+        self.model.reverse()
+        self.assertColour()
+        for _ in range(10):
+            self.erase()
+        self.add(black)
+        self.add(lighten)
+        self.assertColour()
+        self.store.special()
+        self.model.reverse()
+        self.assertColour()
+
+
+class TestSequenceLayerStore(unittest.TestCase):
+
+    def test_add_and_erase(self):
+        s = SequenceLayerStore()
+        self.assertTrue(s.add(red))
+        self.assertFalse(s.add(red))
+        self.assertTrue(s.erase(red))
+        self.assertFalse(s.erase(red))
+        self.assertFalse(s.erase(black))
+
+    def test_get_color_in_index_order(self):
+        s = SequenceLayerStore()
+        s.add(lighten)
+        s.add(black)
+        # black has the lower index, so it applies first no matter the order added
+        self.assertEqual(s.get_color((100, 100, 100), 0, 0, 0), (40, 40, 40))
+
+    def test_special_odd_median(self):
+        s = SequenceLayerStore()
+        for layer in (red, black, lighten):
+            s.add(layer)
+        # Names in order: black, lighten, red
+        s.special()
+        self.assertFalse(s.erase(lighten))
+        self.assertTrue(s.erase(black))
+        self.assertTrue(s.erase(red))
+
+    def test_special_even_picks_smaller_median(self):
+        s = SequenceLayerStore()
+        for layer in (red, black, lighten, blue):
+            s.add(layer)
+        # Names in order: black, blue, lighten, red
+        s.special()
+        self.assertFalse(s.erase(blue))
+        self.assertTrue(s.erase(lighten))
+
+    def test_special_empty(self):
+        s = SequenceLayerStore()
+        s.special()
+        self.assertEqual(s.get_color((1, 2, 3), 0, 0, 0), (1, 2, 3))
+
+    def test_special_until_empty(self):
+        s = SequenceLayerStore()
+        remaining = [layer for layer in get_layers() if layer is not None]
+        for layer in remaining:
+            s.add(layer)
+        remaining.sort(key=lambda layer: layer.name)
+        while remaining:
+            median = remaining.pop((len(remaining) - 1) // 2)
+            s.special()
+            self.assertFalse(s.erase(median))
+        for layer in get_layers():
+            if layer is not None:
+                self.assertFalse(s.erase(layer))
+
+
+class TestAdditiveLateLayer(LateLayerTestCase):
+
+    def test_get_color(self):
+        s = AdditiveLayerStore()
+        s.add(self.late)
+        s.add(lighten)
+        self.assertEqual(s.get_color((0, 0, 0), 0, 0, 0), (190, 115, 40))
+
+
+class TestSequenceLateLayer(LateLayerTestCase):
+
+    def test_get_color(self):
+        s = SequenceLayerStore()
+        s.add(self.late)
+        self.assertEqual(s.get_color((0, 0, 0), 0, 0, 0), (150, 75, 0))
+
+    def test_special_removes_late_median(self):
+        s = SequenceLayerStore()
+        for layer in (red, self.late, black):
+            s.add(layer)
+        # Names in order: black, brown, red
+        s.special()
+        self.assertFalse(s.erase(self.late))
+        self.assertTrue(s.erase(black))
+        self.assertTrue(s.erase(red))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+
+from grid import Grid
+from replay import ReplayTracker
+
+
+class RecordingAction:
+    """Stands in for a PaintAction, recording which apply was called on it."""
+
+    def __init__(self, name: str, log: list) -> None:
+        self.name = name
+        self.log = log
+
+    def undo_apply(self, grid: Grid) -> None:
+        self.log.append(("undo", self.name))
+
+    def redo_apply(self, grid: Grid) -> None:
+        self.log.append(("redo", self.name))
+
+
+class TestReplayTracker(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.log = []
+        self.grid = Grid(Grid.DRAW_STYLE_SET, 2, 2)
+        self.tracker = ReplayTracker()
+
+    def test_plays_in_order(self):
+        a, b = RecordingAction("a", self.log), RecordingAction("b", self.log)
+        self.tracker.add_action(a)
+        self.tracker.add_action(b)
+        self.tracker.add_action(b, is_undo=True)
+        self.tracker.start_replay()
+        results = [self.tracker.play_next_action(self.grid) for _ in range(4)]
+        self.assertEqual(results, [False, False, False, True])
+        self.assertEqual(self.log, [("redo", "a"), ("redo", "b"), ("undo", "b")])
+        self.assertTrue(self.tracker.play_next_action(self.grid))
+
+    def test_empty_replay(self):
+        self.tracker.start_replay()
+        self.assertTrue(self.tracker.play_next_action(self.grid))
+
+    def test_actions_added_after_start_wait_for_next_replay(self):
+        self.tracker.add_action(RecordingAction("a", self.log))
+        self.tracker.start_replay()
+        self.tracker.add_action(RecordingAction("b", self.log))
+        self.assertFalse(self.tracker.play_next_action(self.grid))
+        self.assertTrue(self.tracker.play_next_action(self.grid))
+        self.tracker.start_replay()
+        self.assertFalse(self.tracker.play_next_action(self.grid))
+        self.assertTrue(self.tracker.play_next_action(self.grid))
+        self.assertEqual(self.log, [("redo", "a"), ("redo", "b")])
+
+    def test_clear_drops_replay_in_progress(self):
+        self.tracker.add_action(RecordingAction("a", self.log))
+        self.tracker.add_action(RecordingAction("b", self.log))
+        self.tracker.start_replay()
+        self.tracker.play_next_action(self.grid)
+        self.tracker.clear()
+        self.assertTrue(self.tracker.play_next_action(self.grid))
+        self.assertEqual(self.log, [("redo", "a")])
+
+
+if __name__ == "__main__":
+    unittest.main()